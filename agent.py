@@ -1,16 +1,30 @@
 # agent.py
 
-import os
-from configs import api_config
-from shared import llm
+import asyncio
+import threading
 
-from langchain.agents import (
-    AgentExecutor,
-    create_openai_functions_agent
-)
+from cachetools import TTLCache
+
+from configs import api_config, get_env
+from shared import get_llm
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+llm = get_llm()
+
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
+from langchain_core.runnables import RunnablePassthrough
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_core.messages import HumanMessage, AIMessage
+try:
+    from langchain_community.chat_message_histories import RedisChatMessageHistory
+except ImportError:
+    RedisChatMessageHistory = None
+from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
 from agent_tools import (
@@ -36,103 +50,196 @@ tools = [
     translate_location_to_english,
 ]
 
+# ✅ Static system prompt — kept as a module constant so the prefix stays
+# byte-identical across turns and provider-side prompt caching can hit
+SYSTEM_PROMPT = """
+    You are a multilingual assistant for weather, mandi prices, crop suggestions, plant diseases, and general farming advice.
+
+    Tool routing:
+    - weather → get_weather_with_auto_translation
+    - agriculture/mandi prices → get_agriculture_prices
+    - crop suggestions → get_current_season_crop_suggestion
+    - plant diseases → get_common_diseases
+    - general (non-agricultural) questions → answer from knowledge, no tools
+
+    Location precedence:
+    1. Location named in the current or a previous message — use it directly
+    2. Otherwise, coordinates if provided
+    3. Only call location tools as a last resort
+
+    Behaviour:
+    - Use chat history for follow-ups ("what is temperature?", "give me more" → last topic/location)
+    - Reply in the user's language, conversationally
+    """
+
+def _build_system_message() -> SystemMessage:
+    """Build the system message with a cache breakpoint when supported.
+
+    Anthropic needs an explicit cache_control marker on the static prefix;
+    OpenAI caches stable prefixes automatically, so a plain string suffices.
+    """
+    if "Anthropic" in type(llm).__name__:
+        return SystemMessage(content=[{
+            "type": "text",
+            "text": SYSTEM_PROMPT,
+            "cache_control": {"type": "ephemeral"},
+        }])
+    return SystemMessage(content=SYSTEM_PROMPT)
+
 # ✅ Enhanced prompt with better context handling
 prompt = ChatPromptTemplate.from_messages([
-    ("system", """
-    You are a smart, multilingual assistant that helps users with:
-
-    - Weather forecasts and conditions
-    - Agricultural market prices and rates
-    - Crop suggestions based on season and location
-    - Plant diseases and their management
-    - General farming advice
-
-    ## Your Context Awareness:
-    You have access to the conversation history, so you can:
-    - Remember what the user asked before
-    - Refer to previously mentioned locations
-    - Build on previous responses
-    - Provide contextual follow-up information
-
-    ## Your Logic:
-
-    1. **Context Usage**: Always check the conversation history to understand what the user is referring to.
-    2. **Location Memory**: If a user previously mentioned a location (like "Surat" or "Vadodara"), remember it for follow-up questions.
-    3. **Follow-up Questions**: When users ask "what is temperature?" or "give me more", refer to the previous context.
-    4. **Location Detection**: 
-       - If a location is clearly present in current or previous messages, use it directly
-       - If no location is detected and coordinates are available, use them
-       - Only call location tools if absolutely necessary
-    5. **Tool Selection**: Use the most relevant tool for the user's question:
-       - For **weather**: call `get_weather_with_auto_translation`
-       - For **agriculture prices**: call `get_agriculture_prices`
-       - For **diseases/crop suggestions**: ensure location is known
-    6. **General Questions**: For non-agricultural questions, answer from your knowledge without using tools.
-    7. **Contextual Responses**: When asked for "more" information, expand on your previous response with additional relevant details.
-
-    ## Response Style:
-    - Be conversational and remember previous interactions
-    - Use the language preferred by the user
-    - Provide comprehensive answers that build on previous context
-    - When asked for "more", provide additional relevant information about the last topic discussed
-    """),
+    _build_system_message(),
     MessagesPlaceholder(variable_name="chat_history"),
     ("human", "{input}"),
     MessagesPlaceholder(variable_name="agent_scratchpad")
 ])
 
-# ✅ Create the agent
-agent = create_openai_functions_agent(
-    llm=llm,
-    tools=tools,
-    prompt=prompt
+# ✅ Pre-serialize the tool JSON schemas once — Pydantic schema resolution is
+# the expensive part of binding tools, and it never changes at runtime
+TOOL_SCHEMAS = [convert_to_openai_tool(t) for t in tools]
+
+# ✅ Create the agent — the tool-calling pipeline supports native parallel
+# tool calls, so one LLM turn can request e.g. crops + diseases together and
+# the executor runs them concurrently. Built explicitly (the equivalent of
+# create_tool_calling_agent) so the LLM binds the pre-serialized schemas.
+agent = (
+    RunnablePassthrough.assign(
+        agent_scratchpad=lambda x: format_to_tool_messages(x["intermediate_steps"])
+    )
+    | prompt
+    | llm.bind(tools=TOOL_SCHEMAS)
+    | ToolsAgentOutputParser()
 )
 
 # ✅ Session-based memory store
+# Redis (when REDIS_URL is set) makes sessions survive restarts, expire after
+# a week, and stay shared across Uvicorn workers; the in-process dict is the
+# fallback for local development
 session_stores = {}
 
+REDIS_URL = get_env("REDIS_URL")
+SESSION_TTL_SECONDS = 7 * 24 * 3600
+
+# Redis-backed histories memoized per session — each construction opens a
+# fresh redis client (TCP, and TLS on managed Redis), and the factory runs
+# more than once per turn. Bounded so idle sessions release their client.
+_redis_histories = TTLCache(maxsize=1024, ttl=SESSION_TTL_SECONDS)
+_redis_histories_lock = threading.Lock()
+
+# Above this many characters of history, fold the oldest turns into a summary
+HISTORY_SUMMARY_CHAR_THRESHOLD = 8192
+
+def _trim_messages(messages: list) -> list:
+    """Bound a message list to the configured max message count"""
+    from configs import app_config
+    if len(messages) > app_config.max_chat_history:
+        return messages[-app_config.max_chat_history:]
+    return messages
+
+def _summarize_messages(messages: list) -> list:
+    """Roll the oldest half of an oversized message list into one summary.
+
+    Keeps per-turn input tokens roughly constant in session length instead of
+    replaying every past message into the prompt on every turn.
+    """
+    if len(messages) < 4:
+        return messages
+    if sum(len(str(m.content)) for m in messages) <= HISTORY_SUMMARY_CHAR_THRESHOLD:
+        return messages
+
+    split = len(messages) // 2
+    older, recent = messages[:split], messages[split:]
+    transcript = "\n".join(f"{m.type}: {m.content}" for m in older)
+
+    try:
+        summary = llm.invoke(
+            "Summarize the following conversation in at most 200 tokens. "
+            "Keep every location, crop, and topic the user asked about:\n\n"
+            + transcript
+        ).content.strip()
+    except Exception as e:
+        logger.warning("History summarization failed, keeping full history: %s", e)
+        return messages
+
+    return [SystemMessage(content=f"Conversation summary so far: {summary}")] + recent
+
 def get_session_history(session_id: str) -> ChatMessageHistory:
-    """Get or create a chat message history for a session"""
+    """Get or create a chat message history for a session.
+
+    Deliberately cheap: RunnableWithMessageHistory calls this factory
+    synchronously even on the ainvoke path, so anything slow here would
+    block the event loop — bounding lives in _bound_session_history.
+    """
+    if REDIS_URL and RedisChatMessageHistory is not None:
+        with _redis_histories_lock:
+            history = _redis_histories.get(session_id)
+            if history is None:
+                history = RedisChatMessageHistory(
+                    session_id=session_id,
+                    url=REDIS_URL,
+                    ttl=SESSION_TTL_SECONDS
+                )
+                _redis_histories[session_id] = history
+        return history
+
     if session_id not in session_stores:
         session_stores[session_id] = ChatMessageHistory()
     return session_stores[session_id]
 
-# ✅ Create agent executor with proper message history
-def get_agent_executor(session_id: str) -> AgentExecutor:
-    """Get an agent executor with session-based memory"""
-    
-    # Create the base agent executor
-    agent_executor = AgentExecutor.from_agent_and_tools(
-        agent=agent,
-        tools=tools,
-        verbose=True,
-        handle_parsing_errors=True,
-        max_iterations=3,
-        max_execution_time=60
-    )
-    
-    # Wrap with message history
-    agent_with_chat_history = RunnableWithMessageHistory(
-        agent_executor,
-        get_session_history,
-        input_messages_key="input",
-        history_messages_key="chat_history",
-    )
-    
-    return agent_with_chat_history
+def _bound_session_history(session_id: str) -> None:
+    """Trim and summarize an oversized session before its turn runs.
+
+    Fetch (and for Redis, deserialize) the message list exactly once per
+    turn; only write the store back when bounding actually changed it.
+    May cost an LLM round trip, so the async path runs it in a thread.
+    """
+    history = get_session_history(session_id)
+    messages = history.messages
+    bounded = _summarize_messages(_trim_messages(messages))
+    if bounded is not messages:
+        history.clear()
+        history.add_messages(bounded)
+
+# ✅ Build the executor ONCE at import time — rebuilding it per request just
+# repeats tool-schema resolution on the latency-critical path. Session routing
+# happens via config={"configurable": {"session_id": ...}}, so a single
+# RunnableWithMessageHistory serves every session.
+# verbose=False in production — LangChain's colored stdout logging is
+# surprisingly costly per token under the GIL
+_agent_executor = AgentExecutor.from_agent_and_tools(
+    agent=agent,
+    tools=tools,
+    verbose=False,
+    handle_parsing_errors=True,
+    max_iterations=3,
+    max_execution_time=30
+)
+
+_agent_with_chat_history = RunnableWithMessageHistory(
+    _agent_executor,
+    get_session_history,
+    input_messages_key="input",
+    history_messages_key="chat_history",
+)
+
+def get_agent_executor(session_id: str) -> RunnableWithMessageHistory:
+    """Get the shared agent executor with session-based memory"""
+    return _agent_with_chat_history
 
 # ✅ Enhanced invoke function with proper session handling
 def invoke_agent(session_id: str, input_text: str, lat: float = None, lon: float = None):
     """Invoke the agent with session-based memory"""
-    
-    # Get the agent executor with message history
-    agent_with_history = get_agent_executor(session_id)
-    
+
+    # Reuse the shared executor; the session_id in the config routes memory
+    agent_with_history = _agent_with_chat_history
+
     # Prepare the input with coordinates if provided
     enhanced_input = input_text
     if lat is not None and lon is not None:
         enhanced_input += f" (lat: {lat}, lon: {lon})"
-    
+
+    _bound_session_history(session_id)
+
     # Invoke the agent with session configuration
     result = agent_with_history.invoke(
         {"input": enhanced_input},
@@ -141,18 +248,34 @@ def invoke_agent(session_id: str, input_text: str, lat: float = None, lon: float
     
     return result
 
+# ✅ Async variant for use inside FastAPI handlers (does not block the event loop)
+async def ainvoke_agent(session_id: str, input_text: str, lat: float = None, lon: float = None):
+    """Invoke the agent asynchronously with session-based memory"""
+
+    enhanced_input = input_text
+    if lat is not None and lon is not None:
+        enhanced_input += f" (lat: {lat}, lon: {lon})"
+
+    # Bounding can invoke the summarizer LLM plus Redis I/O — keep it off
+    # the event loop
+    await asyncio.to_thread(_bound_session_history, session_id)
+
+    result = await _agent_with_chat_history.ainvoke(
+        {"input": enhanced_input},
+        config={"configurable": {"session_id": session_id}}
+    )
+
+    return result
+
 # ✅ Optional: Function to get conversation history for debugging
 def get_conversation_history(session_id: str) -> list:
     """Get the conversation history for a session"""
-    if session_id in session_stores:
-        return session_stores[session_id].messages
-    return []
+    return get_session_history(session_id).messages
 
 # ✅ Optional: Function to clear session history
 def clear_session_history(session_id: str):
     """Clear the conversation history for a session"""
-    if session_id in session_stores:
-        session_stores[session_id].clear()
+    get_session_history(session_id).clear()
 
 # ✅ Optional: Function to add manual message to history (for debugging)
 def add_message_to_history(session_id: str, message: str, is_human: bool = True):
@@ -1,6 +1,5 @@
 # agent_tools.py
 
-import re
 from langchain.tools import tool
 from utils import (
     fetch_weather_data_by_city,
@@ -12,12 +11,15 @@ from utils import (
     extract_location_from_text,
     translate_location_name_to_english
 )
-from shared import llm  # use globally shared LLM
+from shared import get_llm
+
+llm = get_llm()  # use globally shared LLM
 
 def is_non_english_text(text: str) -> bool:
     """Check if text contains non-English characters."""
-    non_latin_pattern = r'[^\x00-\x7F\u00C0-\u017F\u0100-\u024F]'
-    return bool(re.search(non_latin_pattern, text))
+    if text.isascii():  # CPython fast C path covers the common case
+        return False
+    return any(c > '\u024F' for c in text)
 
 @tool
 def get_weather_with_auto_translation(city: str = "", lat: float = None, lon: float = None) -> str:
@@ -81,6 +83,22 @@ def get_agriculture_prices(city_or_text: str = "", lat: float = None, lon: float
     except Exception as e:
         return f"Error fetching agriculture prices: {str(e)}"
 
+def _resolve_location_and_answer(location_text: str, task: str) -> str:
+    """
+    Answer a location-bound task in a single LLM round-trip
+
+    The model reads location names in any language, so folding location
+    resolution into the answer prompt replaces the separate
+    detect-language + translate round-trips with one call.
+    """
+    prompt = (
+        f'Location (may be written in any language): "{location_text}"\n'
+        f"Task: {task}\n"
+        "Resolve the location to the city or district it names, then answer "
+        "the task for that location. Reply with the answer only."
+    )
+    return llm.invoke(prompt).content.strip()
+
 @tool
 def get_common_diseases(city_or_text: str = "", lat: float = None, lon: float = None) -> str:
     """Get common diseases for a location in the current season using city name or coordinates."""
@@ -99,11 +117,10 @@ def get_common_diseases(city_or_text: str = "", lat: float = None, lon: float =
         if not location:
             return "Unable to detect location from input or coordinates."
 
-        if is_non_english_text(location):
-            location = translate_location_name_to_english(location)
-
-        prompt = f"What are the common diseases or health concerns in {location} during {month} {year}?"
-        return llm.invoke(prompt).content.strip()
+        return _resolve_location_and_answer(
+            location,
+            f"What are the common diseases or health concerns there during {month} {year}?"
+        )
 
     except Exception as e:
         return f"Error detecting seasonal diseases: {str(e)}"
@@ -125,11 +142,11 @@ def get_current_season_crop_suggestion(city_or_text: str = "", lat: float = None
         if not location:
             return "Unable to detect location."
 
-        if is_non_english_text(location):
-            location = translate_location_name_to_english(location)
-
-        prompt = f"Suggest suitable crops to plant in {location} during {month} {year}, based on the typical season and climate of the region."
-        return llm.invoke(prompt).content.strip()
+        return _resolve_location_and_answer(
+            location,
+            f"Suggest suitable crops to plant there during {month} {year}, "
+            "based on the typical season and climate of the region."
+        )
 
     except Exception as e:
         return f"Error generating crop suggestion: {str(e)}"
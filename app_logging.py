@@ -0,0 +1,44 @@
+"""
+Non-blocking logging setup for the Weather & Agriculture Chatbot API
+"""
+
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listener: QueueListener = None
+
+def setup_logging(level: str = None) -> None:
+    """
+    Configure root logging to go through a queue
+
+    Handlers run on a background thread via QueueListener, so emitting a
+    record from a request handler never blocks on stdout. Safe to call
+    more than once; only the first call configures anything.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+
+    _listener = QueueListener(log_queue, console, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+
+def get_logger(name: str) -> logging.Logger:
+    """Get a logger, making sure the queue-based setup is in place"""
+    setup_logging()
+    return logging.getLogger(name)
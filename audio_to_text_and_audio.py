@@ -2,65 +2,142 @@
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, Request
 from fastapi.responses import FileResponse
-import os, uuid, shutil
+import asyncio
+import pathlib
+import os, uuid
+
+from cachetools import TTLCache
 
 from utils import (
     convert_speech_to_text,          # speech → text
     convert_text_to_speech,          # text → speech
     detect_text_language,            # detect language
+    generate_unique_filename,        # random output names
     translate_text,                  # translate response
     validate_audio_duration          # ensure ≤ 20 sec
 )
 
 # Import the new invoke function
-from agent import invoke_agent
-
-router = APIRouter()
+from agent import ainvoke_agent
+from app_logging import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter(tags=["Audio to Text and Audio"])
+
+# Created once at import — per-request os.makedirs cost syscalls on every POST
+UPLOADS_DIR = pathlib.Path("uploads")
+UPLOADS_DIR.mkdir(exist_ok=True)
+OUTPUTS_DIR = pathlib.Path("outputs")
+OUTPUTS_DIR.mkdir(exist_ok=True)
+
+# TTS jobs still being written, keyed by output filename — lets /audio
+# respond with the URL before synthesis finishes
+_pending_tts: dict[str, "asyncio.Task"] = {}
+
+# Uploads beyond this are rejected before buffering — a 20 s clip is well
+# under 1 MB even as WAV, so 10 MiB leaves generous headroom
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Detected language per session — a user's language does not change
+# mid-conversation, so one Sarvam detection call covers the whole session.
+# TTL-bounded so long-gone sessions don't accumulate forever; a cache miss
+# just costs one re-detection
+_session_langs: TTLCache = TTLCache(maxsize=4096, ttl=24 * 3600)
+
+async def _detect_user_language(session_id: str, user_text: str) -> str:
+    """Detect the user's language, reusing the session's earlier result"""
+    lang = _session_langs.get(session_id)
+    if lang is None:
+        # detect_text_language short-circuits ASCII input without an API call
+        lang = await asyncio.to_thread(detect_text_language, user_text)
+        _session_langs[session_id] = lang
+    return lang
 
 # ---------------------------------------------------------------------
 # GET /get-audio/{filename} → Serve generated MP3 file
 # ---------------------------------------------------------------------
-@router.get("/get-audio/{filename}", tags=["Audio to Text and Audio"])
-def get_audio(filename: str):
+@router.get("/get-audio/{filename}")
+async def get_audio(filename: str):
+    # If synthesis is still running for this file, wait for it to finish
+    pending = _pending_tts.get(filename)
+    if pending is not None:
+        try:
+            await pending
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"TTS error: {e}")
+        finally:
+            _pending_tts.pop(filename, None)
+
     audio_path = os.path.join("outputs", filename)
-    if not os.path.exists(audio_path):
+    try:
+        stat_result = os.stat(audio_path)
+    except OSError:
         raise HTTPException(status_code=404, detail="Audio file not found")
+
+    # Generated files are immutable, so let clients cache them; passing the
+    # stat_result also saves FileResponse a second stat() call and keeps
+    # range requests (Accept-Ranges: bytes) working for audio players
+    etag = f'"{stat_result.st_mtime_ns ^ stat_result.st_size:x}"'
     return FileResponse(
         path=audio_path,
         media_type="audio/mpeg",
         filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        stat_result=stat_result,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "public, max-age=86400",
+            "ETag": etag,
+        }
     )
 
 # ---------------------------------------------------------------------
 # POST /audio → transcribe → run agent → TTS → return response + audio
 # ---------------------------------------------------------------------
-@router.post("/audio", tags=["Audio to Text and Audio"])
+@router.post("/audio")
 async def upload_audio(
     request: Request,
     audio_file: UploadFile = File(...),
     lat: float | None = None,
     lon: float | None = None,
 ):
-    print("Received audio upload request")
+    logger.info("Received audio upload request")
 
     # ---------------- Validate and save uploaded file -----------------------
     if not (audio_file.filename.endswith(".mp3") or audio_file.filename.endswith(".wav")):
-        print("Invalid file type:", audio_file.filename)
+        logger.warning("Invalid file type: %s", audio_file.filename)
         raise HTTPException(status_code=400, detail="Only .mp3 or .wav files are allowed")
 
-    os.makedirs("uploads", exist_ok=True)
-    file_path = f"uploads/{uuid.uuid4()}_{audio_file.filename}"
+    # Reject oversized bodies before buffering anything — Content-Length
+    # catches honest clients cheaply, the bounded read below catches the rest
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > MAX_UPLOAD_BYTES:
+        logger.warning("Upload too large: %s bytes", content_length)
+        raise HTTPException(status_code=413, detail="Audio file too large")
+
+    file_path = str(UPLOADS_DIR / f"{os.urandom(8).hex()}_{audio_file.filename}")
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(audio_file.file, buffer)
-        print(f"Saved uploaded file to {file_path}")
+        # Clips are ≤20 s (<1 MB), so Starlette keeps them spooled in RAM —
+        # read once and write in a single call rather than a 16 KiB copy loop.
+        # The read is capped so a body that lied about its length cannot
+        # exhaust worker memory
+        data = await audio_file.read(MAX_UPLOAD_BYTES + 1)
+        if len(data) > MAX_UPLOAD_BYTES:
+            logger.warning("Upload exceeded %d bytes", MAX_UPLOAD_BYTES)
+            raise HTTPException(status_code=413, detail="Audio file too large")
+
+        def _save_upload():
+            with open(file_path, "wb") as buffer:
+                buffer.write(data)
+
+        await asyncio.to_thread(_save_upload)
+        logger.debug("Saved uploaded file to %s", file_path)
     finally:
-        audio_file.file.close()
+        await audio_file.close()
 
     # ---------------- Check duration limit ----------------------------
-    if not validate_audio_duration(file_path):
-        print("Audio duration exceeds 20 seconds")
+    if not await asyncio.to_thread(validate_audio_duration, file_path):
+        logger.warning("Audio duration exceeds 20 seconds")
         raise HTTPException(
             status_code=400,
             detail="Audio duration exceeds 20 seconds. Please upload a shorter clip."
@@ -68,11 +145,11 @@ async def upload_audio(
 
     # ---------------- Speech → text -----------------------------------
     try:
-        user_text = convert_speech_to_text(file_path)
-        print("Transcribed text:", user_text)
-        
+        user_text = await asyncio.to_thread(convert_speech_to_text, file_path)
+        logger.debug("Transcribed text: %s", user_text)
+
     except Exception as e:
-        print("Speech-to-text error:", e)
+        logger.error("Speech-to-text error: %s", e)
         raise HTTPException(status_code=500, detail=f"Speech-to-text error: {e}")
 
     # ---------------- Run the agent with session memory ---------------
@@ -81,61 +158,77 @@ async def upload_audio(
         if not session_id:
             session_id = str(uuid.uuid4())
 
-        print(f"Using session ID: {session_id}")
-        
-        # Use the new invoke function with proper memory
-        result = invoke_agent(session_id, user_text, lat, lon)
+        logger.debug("Using session ID: %s", session_id)
+
+        # Language detection only needs the transcript, so it runs
+        # concurrently with the (much slower) agent call
+        result, lang_result = await asyncio.gather(
+            ainvoke_agent(session_id, user_text, lat, lon),
+            _detect_user_language(session_id, user_text),
+            return_exceptions=True,
+        )
+        if isinstance(result, Exception):
+            raise result
         answer_text = result["output"]
-        
-        print("Agent result type:", type(answer_text))
-        print("Agent result:", answer_text)
+
+        logger.debug("Agent result: %s", answer_text)
 
     except Exception as e:
-        print("Agent error:", e)
+        logger.error("Agent error: %s", e)
         raise HTTPException(status_code=500, detail=f"Agent error: {e}")
 
     # ---------------- Detect language and optionally translate --------
     try:
-        user_lang = detect_text_language(user_text)
-        print("Detected user language:", user_lang)
+        if isinstance(lang_result, Exception):
+            raise lang_result
+        user_lang = lang_result
+        logger.debug("Detected user language: %s", user_lang)
 
         if user_lang != "en-IN":
-            answer_text = translate_text(
-                text=answer_text,
-                target_language_code=user_lang,
-                source_language_code="en-IN"
+            answer_text = await asyncio.to_thread(
+                translate_text,
+                answer_text,
+                user_lang,
+                "en-IN"
             )
-            print("Translated answer text:", answer_text)
+            logger.debug("Translated answer text: %s", answer_text)
 
     except Exception as e:
-        print("Language detection/translation failed:", e)
+        logger.warning("Language detection/translation failed: %s", e)
         user_lang = "en-IN"
 
     # ---------------- Text → speech -----------------------------------
-    os.makedirs("outputs", exist_ok=True)
-    audio_filename = f"{uuid.uuid4()}.mp3"
-    output_path = os.path.join("outputs", audio_filename)
-    try:
-        convert_text_to_speech(
-            text=answer_text,
-            language_code=user_lang if user_lang else "en-IN",
-            output_file_path=output_path
-        )
-        print(f"Generated TTS audio at {output_path}")
-    except Exception as e:
-        print("TTS error:", e)
-        raise HTTPException(status_code=500, detail=f"TTS error: {e}")
+    audio_filename = generate_unique_filename()
+    output_path = str(OUTPUTS_DIR / audio_filename)
+    # Start synthesis in the background and respond immediately — the client
+    # hits GET /get-audio next, which awaits the pending task if needed
+    tts_task = asyncio.create_task(asyncio.to_thread(
+        convert_text_to_speech,
+        answer_text,
+        user_lang if user_lang else "en-IN",
+        output_path
+    ))
+    _pending_tts[audio_filename] = tts_task
+
+    def _on_tts_done(t: "asyncio.Task"):
+        _pending_tts.pop(audio_filename, None)
+        if t.exception() is None:
+            logger.debug("Generated TTS audio at %s", output_path)
+        else:
+            logger.error("TTS error: %s", t.exception())
+
+    tts_task.add_done_callback(_on_tts_done)
 
     # ---------------- Cleanup uploaded file ---------------------------
     try:
         os.remove(file_path)
-        print(f"Cleaned up uploaded file: {file_path}")
+        logger.debug("Cleaned up uploaded file: %s", file_path)
     except Exception as e:
-        print(f"Could not remove uploaded file: {e}")
+        logger.warning("Could not remove uploaded file: %s", e)
 
     # ---------------- Return response ---------------------------------
     audio_url = str(request.base_url) + f"get-audio/{audio_filename}"
-    print("Returning response with audio_url:", audio_url)
+    logger.debug("Returning response with audio_url: %s", audio_url)
     return {
         "text": answer_text,
         "audio_url": audio_url,
@@ -3,21 +3,30 @@ Configuration file for the Weather & Agriculture Chatbot API
 """
 
 import os
+import functools
+import types
 from dotenv import load_dotenv
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
 
-# Load environment variables
-load_dotenv()
+@functools.lru_cache(maxsize=1)
+def _env() -> Mapping[str, str]:
+    """Parse .env exactly once and snapshot the environment"""
+    load_dotenv()
+    return types.MappingProxyType(dict(os.environ))
+
+def get_env(key: str, default: Optional[str] = None) -> Optional[str]:
+    """Read an environment variable from the cached snapshot"""
+    return _env().get(key, default)
 
 @dataclass
 class APIConfig:
     """Configuration for external API keys"""
-    openai_api_key: str = os.getenv("OPENAI_API_KEY")
-    google_gemini_api_key: str = os.getenv("GOOGLE_GEMINI_API_KEY")
-    sarvam_ai_api_key: str = os.getenv("SARVAM_AI_API_KEY")
-    data_gov_api_key: str = os.getenv("DATA_GOV_API_KEY")
-    openweather_api_key: str = os.getenv("OPENWEATHERMAP_API_KEY")
+    openai_api_key: str = field(default_factory=lambda: get_env("OPENAI_API_KEY"))
+    google_gemini_api_key: str = field(default_factory=lambda: get_env("GOOGLE_GEMINI_API_KEY"))
+    sarvam_ai_api_key: str = field(default_factory=lambda: get_env("SARVAM_AI_API_KEY"))
+    data_gov_api_key: str = field(default_factory=lambda: get_env("DATA_GOV_API_KEY"))
+    openweather_api_key: str = field(default_factory=lambda: get_env("OPENWEATHERMAP_API_KEY"))
 
 @dataclass
 class AppConfig:
@@ -107,11 +116,13 @@ def validate_directories():
     os.makedirs(app_config.upload_directory, exist_ok=True)
     os.makedirs(app_config.output_directory, exist_ok=True)
 
-# Initialize on import
-try:
+def configure():
+    """
+    Validate configuration and create directories
+
+    Called from the FastAPI startup hook rather than at import, so merely
+    importing configs (e.g. from tests) costs no syscalls and cannot raise.
+    """
     validate_api_keys()
     validate_directories()
-    print("✅ Configuration loaded successfully")
-except Exception as e:
-    print(f"❌ Configuration error: {e}")
-    raise
\ No newline at end of file
+    print("✅ Configuration loaded successfully")
\ No newline at end of file
@@ -1,16 +1,24 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+import configs
 from audio_to_text_and_audio import router as audio_router
 from text_to_text_and_audio import router as text_router
 
 app = FastAPI(
     title="APMC Voice Chatbot",
     description="Handles voice queries for weather, mandi prices, diseases, and crop suggestions.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Include your router
-app.include_router(audio_router,tags=["Audio to Text and Audio"])
-app.include_router(text_router, tags=["Text to Text and Audio"])
+# Validate config and create directories once the app actually starts
+@app.on_event("startup")
+async def _startup():
+    configs.configure()
+
+# Include your routers (tags are declared on the routers themselves)
+app.include_router(audio_router)
+app.include_router(text_router)
 
 # Optional: health check endpoint
 @app.get("/")
@@ -1,8 +1,23 @@
 # shared.py
+from functools import lru_cache
+
+import httpx
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from configs import api_config
-import os
 
-llm = ChatOpenAI(model="gpt-4o-mini", api_key=api_config.openai_api_key)
-# llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=os.getenv("GOOGLE_GEMINI_API_KEY"))
+@lru_cache(maxsize=1)
+def get_llm():
+    """Build the shared LLM client once, on first use.
+
+    Lazy so importing shared.py costs nothing, and cached so every caller
+    shares one client (and therefore one keep-alive connection pool).
+    """
+    return ChatOpenAI(
+        model="gpt-4o-mini",
+        api_key=api_config.openai_api_key,
+        http_client=httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20)
+        ),
+    )
+    # return ChatGoogleGenerativeAI(model="gemini-2.0-flash", api_key=api_config.google_gemini_api_key)
@@ -1,46 +1,53 @@
 # test_memory.py
 
+from concurrent.futures import ThreadPoolExecutor
+
 from agent import invoke_agent, get_conversation_history
 
+def run_chain(session_id: str, queries: list) -> list:
+    """Run dependent follow-up queries sequentially on one session"""
+    results = []
+    for i, query in enumerate(queries, 1):
+        print(f"[{session_id}] {i}. {query}")
+        result = invoke_agent(session_id, query)
+        print(f"[{session_id}] Response: {result['output'][:100]}...")
+        results.append(result)
+    return results
+
 def test_memory():
     """Test the memory functionality"""
-    
-    session_id = "test_session_123"
-    
+
     print("=== Testing Memory Functionality ===\n")
-    
-    # Test 1: Ask about weather in Surat
-    print("1. Asking about weather in Surat...")
-    result1 = invoke_agent(session_id, "What is the weather in Surat?")
-    print(f"Response: {result1['output'][:100]}...")
-    
-    # Test 2: Ask follow-up question about temperature
-    print("\n2. Asking follow-up: What is the temperature?")
-    result2 = invoke_agent(session_id, "What is the temperature?")
-    print(f"Response: {result2['output'][:100]}...")
-    
-    # Test 3: Ask for wind speed
-    print("\n3. Asking follow-up: What is the wind speed?")
-    result3 = invoke_agent(session_id, "What is the wind speed?")
-    print(f"Response: {result3['output'][:100]}...")
-    
-    # Test 4: Ask about market prices in Amreli
-    print("\n4. Asking about market prices in Amreli...")
-    result4 = invoke_agent(session_id, "What are the market rates in Amreli?")
-    print(f"Response: {result4['output'][:100]}...")
-    
-    # Test 5: Ask for more information
-    print("\n5. Asking for more information...")
-    result5 = invoke_agent(session_id, "Give me more")
-    print(f"Response: {result5['output'][:100]}...")
-    
-    # Check conversation history
-    print("\n=== Conversation History ===")
-    history = get_conversation_history(session_id)
-    for i, msg in enumerate(history):
-        print(f"{i+1}. {msg.type}: {msg.content[:50]}...")
-    
-    print(f"\nTotal messages in history: {len(history)}")
+
+    # Follow-ups must stay sequential on their own session, but the two
+    # scenarios are independent of each other, so they run concurrently
+    scenarios = {
+        "test_session_weather": [
+            "What is the weather in Surat?",
+            "What is the temperature?",
+            "What is the wind speed?",
+        ],
+        "test_session_market": [
+            "What are the market rates in Amreli?",
+            "Give me more",
+        ],
+    }
+
+    with ThreadPoolExecutor(max_workers=len(scenarios)) as executor:
+        futures = {
+            session_id: executor.submit(run_chain, session_id, queries)
+            for session_id, queries in scenarios.items()
+        }
+        for future in futures.values():
+            future.result()
+
+    # Check conversation history per session
+    for session_id in scenarios:
+        print(f"\n=== Conversation History: {session_id} ===")
+        history = get_conversation_history(session_id)
+        for i, msg in enumerate(history):
+            print(f"{i+1}. {msg.type}: {msg.content[:50]}...")
+        print(f"\nTotal messages in history: {len(history)}")
 
 if __name__ == "__main__":
-    test_memory()
\ No newline at end of file
+    test_memory()
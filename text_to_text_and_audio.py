@@ -1,37 +1,40 @@
 # text_to_text_and_audio.py
 
 from fastapi import APIRouter, HTTPException, Request, Query
-from fastapi.responses import FileResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
+import base64
+import pathlib
 import uuid, os
 
 from utils import (
     detect_text_language,            # text → language
     translate_text,                  # text → translated text
-    convert_text_to_speech           # text → speech
+    convert_text_to_speech,          # text → speech
+    generate_unique_filename         # random output names
 )
 
 # Import the new invoke function
-from agent import invoke_agent
+from agent import ainvoke_agent
+from app_logging import get_logger
 
-router = APIRouter()
+logger = get_logger(__name__)
 
-# ---------------------------------------------------------------------
-# GET /get-audio/{filename} → Serve generated MP3 file
-# ---------------------------------------------------------------------
-@router.get("/get-audio/{filename}", tags=["Text to Text and Audio"])
-def get_audio(filename: str):
-    audio_path = os.path.join("outputs", filename)
-    if not os.path.exists(audio_path):
-        raise HTTPException(status_code=404, detail="Audio file not found")
-    return FileResponse(
-        path=audio_path,
-        media_type="audio/mpeg",
-        filename=filename,
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
-    )
+router = APIRouter(tags=["Text to Text and Audio"])
+
+# Created once at import — the per-request os.makedirs was two syscalls on
+# every POST /text
+OUTPUTS_DIR = pathlib.Path("outputs")
+OUTPUTS_DIR.mkdir(exist_ok=True)
+
+# MP3s up to this size are inlined (base64) in the /text JSON response,
+# saving the client the follow-up GET /get-audio round trip
+INLINE_AUDIO_MAX_BYTES = 512 * 1024
 
+# NOTE: GET /get-audio/{filename} is served by the audio router
+# (audio_to_text_and_audio.py) — the copy that used to live here shadowed
+# it with a second registration of the same path.
 
 # ---------------------------------------------------------------------
 # POST /text → run agent → (translate) → TTS → return response + audio
@@ -40,14 +43,14 @@ class TextQuery(BaseModel):
     text: str
     langs: List[str] = []
 
-@router.post("/text", tags=["Text to Text and Audio"])
+@router.post("/text")
 async def text_to_text_and_audio(
     request: Request,
     payload: TextQuery,
     lat: Optional[float] = Query(default=None, description="Latitude (optional)"),
     lon: Optional[float] = Query(default=None, description="Longitude (optional)"),
 ):
-    print("Received text query request")
+    logger.info("Received text query request")
 
     user_text = payload.text.strip()
     if not user_text:
@@ -59,44 +62,46 @@ async def text_to_text_and_audio(
         if not session_id:
             session_id = str(uuid.uuid4())
 
-        print(f"Using session ID: {session_id}")
-        print(f"User input: {user_text}")
-        
-        # Use the new invoke function with proper memory
-        result = invoke_agent(session_id, user_text, lat, lon)
+        logger.debug("Using session ID: %s", session_id)
+        logger.debug("User input: %s", user_text)
+
+        # Language detection only needs the user text, so it overlaps the
+        # (much slower) agent call instead of running after it
+        result, lang_result = await asyncio.gather(
+            ainvoke_agent(session_id, user_text, lat, lon),
+            asyncio.to_thread(detect_text_language, user_text),
+            return_exceptions=True,
+        )
+        if isinstance(result, Exception):
+            raise result
         answer_text = result["output"]
 
-        print("Agent result type:", type(answer_text))
-        print("Agent result:", answer_text)
+        logger.debug("Agent result: %s", answer_text)
 
     except Exception as e:
-        print("Agent error:", e)
+        logger.error("Agent error: %s", e)
         raise HTTPException(status_code=500, detail=f"Agent error: {e}")
 
     # ---------------- Detect language and optionally translate ------------
     try:
-        user_lang = detect_text_language(user_text)
-        print("Detected user language:", user_lang)
+        if isinstance(lang_result, Exception):
+            raise lang_result
+        user_lang = lang_result
+        logger.debug("Detected user language: %s", user_lang)
 
-        # # Match allowed language (if any)
-        # if payload.langs:
-        #     for lang in payload.langs:
-        #         if lang.startswith(user_lang.split("-")[0]):
-        #             user_lang = lang
-        #             break
-
-        # Match allowed language (if any)
+        # Match allowed language (if any) via a one-shot prefix index instead
+        # of re-splitting user_lang on every loop iteration
         if payload.langs:
-            matched = False
-            for lang in payload.langs:
-                if lang.startswith(user_lang.split("-")[0]):
-                    user_lang = lang
-                    matched = True
-                    break
-            if not matched:
+            # reversed so the first entry wins for a duplicated prefix,
+            # matching the old loop's break-on-first behaviour
+            by_prefix = {lang.split("-", 1)[0]: lang for lang in reversed(payload.langs)}
+            matched_lang = by_prefix.get(user_lang.split("-", 1)[0])
+            if matched_lang is not None:
+                user_lang = matched_lang
+            else:
                 # Fallback to the first allowed language
                 user_lang = payload.langs[0]
-                print(f"No match found, using fallback language: {user_lang}")
+                logger.debug("No match found, using fallback language: %s", user_lang)
 
          # if user_lang != "en-IN":
         #     answer_text = translate_text(
@@ -106,45 +111,57 @@ async def text_to_text_and_audio(
         #     )
         
         # Translate if output language is different from expected
-        detected_answer_lang = detect_text_language(answer_text)
-        print(f"Detected answer language: {detected_answer_lang}")
-        
+        detected_answer_lang = await asyncio.to_thread(detect_text_language, answer_text)
+        logger.debug("Detected answer language: %s", detected_answer_lang)
+
         if detected_answer_lang != user_lang:
             try:
-                answer_text = translate_text(
-                    text=answer_text,
-                    target_language_code=user_lang,
-                    source_language_code=detected_answer_lang
+                answer_text = await asyncio.to_thread(
+                    translate_text,
+                    answer_text,
+                    user_lang,
+                    detected_answer_lang
                 )
-                print("Translated answer text:", answer_text)
+                logger.debug("Translated answer text: %s", answer_text)
             except Exception as e:
-                print("Translation failed:", e)
+                logger.warning("Translation failed: %s", e)
 
     except Exception as e:
-        print("Language detection/translation failed:", e)
+        logger.warning("Language detection/translation failed: %s", e)
         user_lang = "en-IN"
 
     # ---------------- Text → speech ---------------------------------------
-    os.makedirs("outputs", exist_ok=True)
-    audio_filename = f"{uuid.uuid4()}.mp3"
-    output_path = os.path.join("outputs", audio_filename)
+    audio_filename = generate_unique_filename()
+    output_path = str(OUTPUTS_DIR / audio_filename)
     try:
-        convert_text_to_speech(
-            text=answer_text,
-            language_code=user_lang if user_lang else "en-IN",
-            output_file_path=output_path
+        await asyncio.to_thread(
+            convert_text_to_speech,
+            answer_text,
+            user_lang if user_lang else "en-IN",
+            output_path
         )
-        print(f"Generated TTS audio at {output_path}")
+        logger.debug("Generated TTS audio at %s", output_path)
     except Exception as e:
-        print("TTS error:", e)
+        logger.error("TTS error: %s", e)
         raise HTTPException(status_code=500, detail=f"TTS error: {e}")
 
     # ---------------- Return JSON response --------------------------------
     audio_url = str(request.base_url) + f"get-audio/{audio_filename}"
-    print("Returning response with audio_url:", audio_url)
+    logger.debug("Returning response with audio_url: %s", audio_url)
+
+    # Inline small files so the client can play them without another request
+    audio_b64 = None
+    try:
+        if os.path.getsize(output_path) <= INLINE_AUDIO_MAX_BYTES:
+            audio_bytes = await asyncio.to_thread(pathlib.Path(output_path).read_bytes)
+            audio_b64 = base64.b64encode(audio_bytes).decode()
+    except OSError as e:
+        logger.warning("Could not inline audio %s: %s", output_path, e)
+
     return {
         "text": answer_text,
         "audio_url": audio_url,
+        "audio_b64": audio_b64,
         "language": user_lang,
         "audio_filename": audio_filename,
         "session_id": session_id
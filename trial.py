@@ -53,4 +53,7 @@
 
 from utils import get_district_from_coords, fetch_weather_data_by_coords
 
-print(fetch_weather_data_by_coords(21.1702, 72.8311))
\ No newline at end of file
+# Guarded so importing this module (e.g. test discovery) doesn't fire a live
+# OpenWeather call
+if __name__ == "__main__":
+    print(fetch_weather_data_by_coords(21.1702, 72.8311))
\ No newline at end of file
@@ -2,22 +2,89 @@
 Utility functions for the Weather & Agriculture Chatbot API
 """
 
+import base64
+import hashlib
+import mmap
 import os
-import uuid
+import re
+import subprocess
+import tempfile
+import threading
+import unicodedata
+import orjson
 import requests
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Dict, Any
+from cachetools import TTLCache, cached
+from cachetools.keys import hashkey
 from sarvamai import SarvamAI
 from sarvamai.play import save
-from pydub import AudioSegment
 from fastapi import HTTPException
 from configs import api_config, app_config, weather_config, agriculture_config
+from app_logging import get_logger
+
+logger = get_logger(__name__)
 
 # Initialize Sarvam AI client
 sarvam_client = SarvamAI(api_subscription_key=api_config.sarvam_ai_api_key)
 
-# Weather API Key
+# OpenWeather constants hoisted once — the fetchers sit on the hot path and
+# these never change after startup
 openweather_api_key = api_config.openweather_api_key
+_owm_base_url = weather_config.base_url
+_owm_units = weather_config.units
+
+# Shared session for outbound HTTP — keep-alive avoids a fresh TCP + TLS
+# handshake (~50-150 ms) on every weather/agriculture call. The Sarvam SDK
+# client above already pools its own connections.
+http_session = requests.Session()
+_adapter = requests.adapters.HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    # Transient upstream hiccups (connection resets, 502/503 from OWM or
+    # data.gov) retry twice with a short backoff instead of failing the
+    # whole user request
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.1,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=("GET",),
+    ),
+)
+http_session.mount("https://", _adapter)
+http_session.mount("http://", _adapter)
+
+# Result caches — location extraction/translation are pure functions of their
+# input text (each an LLM or API round-trip), weather changes slowly and
+# mandi prices are daily, so repeated queries in a session can hit cache
+_location_cache = TTLCache(maxsize=1024, ttl=3600)
+_location_translation_cache = TTLCache(maxsize=1024, ttl=3600)
+_weather_cache = TTLCache(maxsize=256, ttl=600)
+_agriculture_cache = TTLCache(maxsize=256, ttl=600)
+
+# Full-text translations keyed by content hash + language pair — recurring UI
+# phrases and repeated answers skip the Sarvam round-trip for a day
+_translation_cache = TTLCache(maxsize=10_000, ttl=86_400)
+_translation_cache_lock = threading.Lock()
+
+# Supported language codes as a frozenset built once at import — the per-call
+# import + list scan in is_valid_language_code was pure overhead
+try:
+    from configs import language_config
+    _SUPPORTED_LANGS = frozenset(language_config.supported_languages)
+except ImportError:
+    # Fallback if language_config is not available
+    _SUPPORTED_LANGS = frozenset(
+        ("en", "hi", "gu", "ta", "te", "bn", "mr", "kn", "ml", "or", "pa", "as")
+    )
+
+def _text_cache_key(text, *args, **kwargs):
+    """Normalize text so 'Surat ' and 'surat' share a cache entry"""
+    return hashkey(" ".join(str(text).lower().split()))
 
 # Audio Processing Functions
 def convert_speech_to_text(audio_file_path: str) -> str:
@@ -34,9 +101,17 @@ def convert_speech_to_text(audio_file_path: str) -> str:
         HTTPException: If transcription fails
     """
     try:
+        # Memory-map the clip so the SDK reads file-backed pages instead of
+        # copying the whole recording onto the heap — keeps resident memory
+        # flat when several uploads are transcribed concurrently. The raw
+        # mmap has no .name, so pass the filename explicitly — Sarvam needs
+        # the extension to pick the right decoder
         with open(audio_file_path, 'rb') as audio_file:
-            transcription_result = sarvam_client.speech_to_text.transcribe(file=audio_file)
-            return transcription_result.transcript
+            with mmap.mmap(audio_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                transcription_result = sarvam_client.speech_to_text.transcribe(
+                    file=(os.path.basename(audio_file_path), mapped)
+                )
+                return transcription_result.transcript
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -69,56 +144,105 @@ def convert_text_to_speech(
     try:
         model = model or app_config.default_tts_model
         speaker = speaker or app_config.default_tts_speaker
-        
+
         audio_response = sarvam_client.text_to_speech.convert(
             target_language_code=language_code,
             text=text,
             model=model,
             speaker=speaker
         )
-        
-        # Save as WAV first
-        temp_wav_path = "temp_output.wav"
-        save(audio_response, temp_wav_path)
-        
-        # Convert to MP3
-        audio_segment = AudioSegment.from_wav(temp_wav_path)
-        audio_segment.export(output_file_path, format="mp3")
-        
-        # Clean up temporary file
-        if os.path.exists(temp_wav_path):
-            os.remove(temp_wav_path)
-            
+
+        # Pipe the WAV bytes through one ffmpeg process, stdin to stdout —
+        # no temp WAV on disk and no pydub decode of the full PCM in Python
+        wav_bytes = _tts_response_to_wav_bytes(audio_response)
+        proc = subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+             "-f", "mp3", "-b:a", "96k", "pipe:1"],
+            input=wav_bytes,
+            capture_output=True,
+            check=True
+        )
+
+        with open(output_file_path, "wb") as output_file:
+            output_file.write(proc.stdout)
+
         return output_file_path
-        
+
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to generate speech: {str(e)}"
         )
 
+def _tts_response_to_wav_bytes(audio_response) -> bytes:
+    """
+    Get raw WAV bytes from a Sarvam TTS response
+
+    Args:
+        audio_response: Response object from text_to_speech.convert
+
+    Returns:
+        Decoded WAV bytes
+    """
+    audios = getattr(audio_response, "audios", None)
+    if audios:
+        return b"".join(base64.b64decode(chunk) for chunk in audios)
+
+    # Fallback for response shapes the SDK only knows how to save itself.
+    # Per-call tempfile — a shared hardcoded name would make concurrent TTS
+    # requests overwrite and delete each other's WAV
+    fd, temp_wav_path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        save(audio_response, temp_wav_path)
+        with open(temp_wav_path, "rb") as wav_file:
+            return wav_file.read()
+    finally:
+        try:
+            os.unlink(temp_wav_path)
+        except OSError:
+            pass
+
 
 
 # Language Processing Functions
+@lru_cache(maxsize=64)
+def _format_language_code(lang_code: str) -> str:
+    """Normalize a language code to Sarvam's xx-IN form, memoized"""
+    # "auto" is a Sarvam sentinel, not a language — leave it alone
+    if lang_code and lang_code != "auto" and not lang_code.endswith("-IN"):
+        return f"{lang_code}-IN"
+    return lang_code
+
+@lru_cache(maxsize=4096)
+def _detect_language_cached(sample: str) -> str:
+    """Identify language of a text sample via Sarvam, memoized on the sample"""
+    language_result = sarvam_client.text.identify_language(input=sample)
+    return language_result.language_code
+
 def detect_text_language(text: str) -> str:
     """
     Detect the language of the given text
-    
+
     Args:
         text: Text to analyze
-        
+
     Returns:
         Language code
-        
+
     Raises:
         HTTPException: If language detection fails
     """
     try:
-        language_result = sarvam_client.text.identify_language(input=text)
-        return language_result.language_code
+        # Pure-ASCII text is English in this app's traffic — skip the API
+        if text.isascii():
+            return "en-IN"
+        # The first 128 chars are plenty to identify a language; bounding the
+        # sample keeps the cache key small and dedupes repeat inputs
+        return _detect_language_cached(text[:128])
     except Exception as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to detect language: {str(e)}"
         )
 
@@ -139,43 +263,79 @@ def translate_text(text: str, target_language_code: str, source_language_code: s
     """
     try:
         # Convert language codes to the format expected by Sarvam API
-        def format_language_code(lang_code: str) -> str:
-            if lang_code and not lang_code.endswith("-IN"):
-                return f"{lang_code}-IN"
-            return lang_code
-
-        formatted_source = format_language_code(source_language_code)
-        formatted_target = format_language_code(target_language_code)
+        formatted_source = _format_language_code(source_language_code)
+        formatted_target = _format_language_code(target_language_code)
 
         # If source and target are the same, skip translation
         if formatted_source == formatted_target:
             return text
 
+        cache_key = (
+            hashlib.blake2b(text.encode(), digest_size=16).digest(),
+            formatted_source,
+            formatted_target,
+        )
+        with _translation_cache_lock:
+            cached = _translation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         # Split text into chunks of <=1000 characters
         max_chars = 1000
-        paragraphs = text.split("\n")
-        chunks = []
-        current = ""
-
-        for para in paragraphs:
-            if len(current) + len(para) + 1 <= max_chars:
-                current += para + "\n"
-            else:
-                chunks.append(current.strip())
-                current = para + "\n"
-        if current:
-            chunks.append(current.strip())
-
-        translated_chunks = []
-        for chunk in chunks:
+
+        if len(text) <= max_chars:
+            # Common case: fits in one request, skip chunking entirely
+            chunks = [text.strip()]
+        else:
+            # Greedy single pass over paragraphs with a running length —
+            # appending to a list avoids rebuilding the accumulator string
+            # on every iteration (O(n²) for large inputs)
+            chunks = []
+            buf = []
+            buf_len = 0
+            for para in text.split("\n"):
+                para_len = len(para) + 1
+                if buf and buf_len + para_len > max_chars:
+                    chunks.append("\n".join(buf).strip())
+                    buf = [para]
+                    buf_len = para_len
+                else:
+                    buf.append(para)
+                    buf_len += para_len
+            if buf:
+                chunks.append("\n".join(buf).strip())
+
+            # Second pass: stripping can shrink a chunk well below budget
+            # (runs of blank lines), so coalesce neighbours that now fit
+            # together — every merged pair is one fewer Sarvam round-trip
+            merged = []
+            for chunk in chunks:
+                if merged and len(merged[-1]) + 1 + len(chunk) <= max_chars:
+                    merged[-1] = f"{merged[-1]}\n{chunk}"
+                else:
+                    merged.append(chunk)
+            chunks = merged
+
+        def _translate_chunk(chunk: str) -> str:
             result = sarvam_client.text.translate(
                 input=chunk,
                 source_language_code=formatted_source,
                 target_language_code=formatted_target,
             )
-            translated_chunks.append(result.translated_text.strip())
+            return result.translated_text.strip()
+
+        # Chunks are independent, so fan them out instead of paying one
+        # full API round-trip per chunk serially
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(8, len(chunks))) as pool:
+                translated_chunks = list(pool.map(_translate_chunk, chunks))
+        else:
+            translated_chunks = [_translate_chunk(chunks[0])]
 
-        return "\n".join(translated_chunks)
+        translated = "\n".join(translated_chunks)
+        with _translation_cache_lock:
+            _translation_cache[cache_key] = translated
+        return translated
 
     except Exception as e:
         raise HTTPException(
@@ -183,6 +343,7 @@ def translate_text(text: str, target_language_code: str, source_language_code: s
             detail=f"Failed to translate text: {str(e)}"
         )
     
+@cached(_location_translation_cache, key=_text_cache_key, lock=threading.Lock())
 def translate_location_name_to_english(location_name: str) -> str:
     """
     Translate extracted location name to English and sanitize output
@@ -200,11 +361,16 @@ def translate_location_name_to_english(location_name: str) -> str:
         return None
 
     try:
-        lang_code = detect_text_language(location_name)
+        # ASCII names are already English — no API work at all
+        if location_name.isascii():
+            return location_name.strip().rstrip(".")
+
+        # One round-trip instead of two: Sarvam translate accepts "auto" as
+        # the source, so the separate detect_text_language call goes away
         translated = translate_text(
             text=location_name,
             target_language_code="en",
-            source_language_code=lang_code
+            source_language_code="auto"
         )
         return translated.strip().rstrip(".")
     except Exception as e:
@@ -212,6 +378,26 @@ def translate_location_name_to_english(location_name: str) -> str:
 
 
 # Location Extraction Function
+
+# Gujarat's districts (the APMC coverage area) plus a few cities that show up
+# in queries — a compiled alternation over this gazetteer resolves the common
+# "weather in Rajkot" case locally instead of paying an LLM round-trip
+_GAZETTEER = (
+    "Ahmedabad", "Amreli", "Anand", "Aravalli", "Banaskantha", "Bharuch",
+    "Bhavnagar", "Botad", "Chhota Udaipur", "Dahod", "Dang", "Devbhoomi Dwarka",
+    "Gandhinagar", "Gir Somnath", "Jamnagar", "Junagadh", "Kheda", "Kutch",
+    "Mahisagar", "Mehsana", "Morbi", "Narmada", "Navsari", "Panchmahal",
+    "Patan", "Porbandar", "Rajkot", "Sabarkantha", "Surat", "Surendranagar",
+    "Tapi", "Vadodara", "Valsad",
+    "Mumbai", "Delhi", "Pune", "Nashik",
+)
+_GAZETTEER_RE = re.compile(
+    r"\b(" + "|".join(sorted(_GAZETTEER, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+_GAZETTEER_CANONICAL = {name.lower(): name for name in _GAZETTEER}
+
+@cached(_location_cache, key=_text_cache_key, lock=threading.Lock())
 def extract_location_from_text(text: str, llm) -> Optional[str]:
     """
     Extract location name from user input using an LLM
@@ -227,6 +413,12 @@ def extract_location_from_text(text: str, llm) -> Optional[str]:
         HTTPException: If LLM extraction fails
     """
     try:
+        # Fast path: a known district/city named outright needs no LLM.
+        # Non-Latin queries fall through to the model
+        match = _GAZETTEER_RE.search(text)
+        if match:
+            return _GAZETTEER_CANONICAL[match.group(1).lower()]
+
         prompt = (
             "Extract the name of a city or district from the following text. "
             "If none is found, reply with 'None'.\n\n"
@@ -240,6 +432,7 @@ def extract_location_from_text(text: str, llm) -> Optional[str]:
 
 
 # Weather Data Functions
+@cached(_weather_cache, key=_text_cache_key, lock=threading.Lock())
 def fetch_weather_data_by_city(city_name: str) -> Optional[Dict[str, Any]]:
     """
     Fetch weather data for a given city
@@ -254,12 +447,20 @@ def fetch_weather_data_by_city(city_name: str) -> Optional[Dict[str, Any]]:
         HTTPException: If API request fails
     """
     try:
-        request_url = f"{weather_config.base_url}?q={city_name}&appid={api_config.openweather_api_key}&units={weather_config.units}"
-        
-        response = requests.get(request_url, timeout=weather_config.timeout_seconds)
+        # params= lets requests url-encode the city name — spaces or '&' in a
+        # name no longer corrupt the query string
+        response = http_session.get(
+            _owm_base_url,
+            params={
+                "q": city_name,
+                "appid": openweather_api_key,
+                "units": _owm_units,
+            },
+            timeout=weather_config.timeout_seconds,
+        )
         response.raise_for_status()
         
-        weather_data = response.json()
+        weather_data = orjson.loads(response.content)
         
         if weather_data.get("cod") != 200:
             return None
@@ -272,36 +473,53 @@ def fetch_weather_data_by_city(city_name: str) -> Optional[Dict[str, Any]]:
             detail=f"Failed to fetch weather data: {str(e)}"
         )
 
+@cached(TTLCache(maxsize=1024, ttl=600), lock=threading.Lock())
+def _owm_by_coords(lat: float, lon: float) -> Optional[Dict[str, Any]]:
+    """
+    Fetch the raw OpenWeatherMap response for coordinates, cached briefly
+
+    Both fetch_weather_data_by_coords and get_district_from_coords hit the
+    same endpoint; callers are rounded to 3 decimals (~100 m) before reaching
+    here so nearby re-queries share one entry and one round-trip.
+    """
+    response = http_session.get(
+        _owm_base_url,
+        params={
+            "lat": lat,
+            "lon": lon,
+            "appid": openweather_api_key,
+            "units": _owm_units,
+        },
+        timeout=weather_config.timeout_seconds,
+    )
+    response.raise_for_status()
+
+    weather_data = orjson.loads(response.content)
+
+    if weather_data.get("cod") != 200:
+        return None
+
+    return weather_data
+
 def fetch_weather_data_by_coords(lat: float, lon: float) -> Optional[Dict[str, Any]]:
     """
     Fetch weather data for given coordinates
-    
+
     Args:
         lat: Latitude coordinate
         lon: Longitude coordinate
-        
+
     Returns:
         Weather data dictionary or None if not found
-        
+
     Raises:
         HTTPException: If API request fails
     """
     try:
-        request_url = f"{weather_config.base_url}?lat={lat}&lon={lon}&appid={api_config.openweather_api_key}&units={weather_config.units}"
-        
-        response = requests.get(request_url, timeout=weather_config.timeout_seconds)
-        response.raise_for_status()
-        
-        weather_data = response.json()
-        
-        if weather_data.get("cod") != 200:
-            return None
-            
-        return weather_data
-        
+        return _owm_by_coords(round(lat, 3), round(lon, 3))
     except requests.RequestException as e:
         raise HTTPException(
-            status_code=500, 
+            status_code=500,
             detail=f"Failed to fetch weather data by coordinates: {str(e)}"
         )
     
@@ -326,14 +544,16 @@ def format_weather_data(weather_data: Dict[str, Any]) -> str:
         description = weather_data["weather"][0]["description"]
         wind_speed = weather_data.get("wind", {}).get("speed", "N/A")
         
-        formatted = f"Weather in {city}:\n"
-        formatted += f"• Condition: {description.title()}\n"
-        formatted += f"• Temperature: {temperature}°C (feels like {feels_like}°C)\n"
-        formatted += f"• Humidity: {humidity}%\n"
+        parts = [
+            f"Weather in {city}:\n",
+            f"• Condition: {description.title()}\n",
+            f"• Temperature: {temperature}°C (feels like {feels_like}°C)\n",
+            f"• Humidity: {humidity}%\n",
+        ]
         if wind_speed != "N/A":
-            formatted += f"• Wind Speed: {wind_speed} m/s"
-        
-        return formatted
+            parts.append(f"• Wind Speed: {wind_speed} m/s")
+
+        return "".join(parts)
         
     except KeyError as e:
         return f"Weather data format error: {str(e)}"
@@ -341,6 +561,7 @@ def format_weather_data(weather_data: Dict[str, Any]) -> str:
 
 
 # Agriculture Data Functions
+@cached(_agriculture_cache, key=_text_cache_key, lock=threading.Lock())
 def fetch_agriculture_prices(district: str) -> Dict[str, Any]:
     """
     Fetch agriculture price data for a given district
@@ -355,12 +576,22 @@ def fetch_agriculture_prices(district: str) -> Dict[str, Any]:
         HTTPException: If API request fails
     """
     try:
-        request_url = f"{agriculture_config.base_url}?api-key={api_config.data_gov_api_key}&format=json&filters[district]={district}&limit={agriculture_config.max_records}"
-        
-        response = requests.get(request_url, timeout=agriculture_config.timeout_seconds)
+        response = http_session.get(
+            agriculture_config.base_url,
+            params={
+                "api-key": api_config.data_gov_api_key,
+                "format": "json",
+                "filters[district]": district,
+                "limit": agriculture_config.max_records,
+            },
+            timeout=agriculture_config.timeout_seconds,
+        )
         response.raise_for_status()
         
-        data = response.json()
+        # Parse the raw bytes with orjson — the agriculture payload can run to
+        # thousands of records, and skipping the intermediate str decode
+        # matters most there
+        data = orjson.loads(response.content)
         
         return {
             "status": "success",
@@ -396,9 +627,13 @@ def format_agriculture_data(price_data: Dict[str, Any]) -> str:
         if not records:
             return f"No agriculture price data found for {district}"
         
-        formatted = f"Agriculture Prices in {district}:\n"
-        formatted += f"Found {len(records)} records\n\n"
-        
+        # Build the pieces in a list and join once — str += copies the whole
+        # accumulator on every append
+        parts = [
+            f"Agriculture Prices in {district}:\n",
+            f"Found {len(records)} records\n\n",
+        ]
+
         # Show first 5 records
         for i, record in enumerate(records[:5], 1):
             commodity = record.get("commodity", "Unknown")
@@ -407,17 +642,17 @@ def format_agriculture_data(price_data: Dict[str, Any]) -> str:
             max_price = record.get("max_price", "N/A")
             modal_price = record.get("modal_price", "N/A")
             market = record.get("market", "N/A")
-            
-            formatted += f"{i}. {commodity}"
+
+            parts.append(f"{i}. {commodity}")
             if variety != "N/A":
-                formatted += f" ({variety})"
-            formatted += f"\n   Market: {market}\n"
-            formatted += f"   Min: ₹{min_price}, Max: ₹{max_price}, Modal: ₹{modal_price}\n\n"
-        
+                parts.append(f" ({variety})")
+            parts.append(f"\n   Market: {market}\n")
+            parts.append(f"   Min: ₹{min_price}, Max: ₹{max_price}, Modal: ₹{modal_price}\n\n")
+
         if len(records) > 5:
-            formatted += f"... and {len(records) - 5} more records"
-        
-        return formatted
+            parts.append(f"... and {len(records) - 5} more records")
+
+        return "".join(parts)
         
     except Exception as e:
         return f"Agriculture data format error: {str(e)}"
@@ -444,19 +679,59 @@ def validate_audio_file(filename: str, file_size: int = None) -> bool:
     # Additional size check can be added here if needed
     return True
 
+def _probe_audio_duration(file_path: str) -> Optional[float]:
+    """
+    Read audio duration from file headers without decoding
+
+    Args:
+        file_path: Path to the audio file
+
+    Returns:
+        Duration in seconds, or None if the format is not handled
+    """
+    extension = os.path.splitext(file_path.lower())[1]
+
+    if extension == ".wav":
+        import wave
+        try:
+            with wave.open(file_path, "rb") as wav_file:
+                frame_rate = wav_file.getframerate()
+                if frame_rate:
+                    return wav_file.getnframes() / frame_rate
+        except (wave.Error, EOFError):
+            # Non-PCM WAVs (ADPCM/GSM from recorder apps) are beyond the
+            # stdlib parser — let ffprobe handle them
+            pass
+        return None
+
+    if extension == ".mp3":
+        try:
+            from mutagen.mp3 import MP3
+            return MP3(file_path).info.length
+        except ImportError:
+            return None
+
+    return None
+
 def validate_audio_duration(file_path: str) -> bool:
     """
     Validate audio file duration
-    
+
     Args:
         file_path: Path to the audio file
-        
+
     Returns:
         True if duration is within limits, False otherwise
     """
     try:
-        audio = AudioSegment.from_file(file_path)
-        duration_seconds = audio.duration_seconds
+        # Header probe is microseconds; ffprobe reads format metadata only
+        # (no decode), so even the fallback never loads PCM into memory
+        duration_seconds = _probe_audio_duration(file_path)
+        if duration_seconds is None:
+            duration_seconds = float(subprocess.check_output(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                 "-of", "csv=p=0", file_path]
+            ))
         return duration_seconds <= app_config.max_audio_duration_seconds
     except Exception:
         return False
@@ -464,28 +739,40 @@ def validate_audio_duration(file_path: str) -> bool:
 def generate_unique_filename(extension: str = ".mp3") -> str:
     """
     Generate a unique filename
-    
+
     Args:
         extension: File extension (default: .mp3)
-        
+
     Returns:
         Unique filename
     """
-    return f"{str(uuid.uuid4())}{extension}"
+    # 128 random bits straight from the OS — same collision resistance as
+    # uuid4 without constructing and str()-formatting a UUID object
+    return f"{os.urandom(16).hex()}{extension}"
+
+# Small shared pool so multi-file cleanups don't serialize their syscalls
+_cleanup_pool = ThreadPoolExecutor(max_workers=4)
+
+def _unlink_quietly(file_path: str) -> None:
+    """Delete a file in one syscall, ignoring a missing target"""
+    try:
+        Path(file_path).unlink(missing_ok=True)
+    except OSError as e:
+        logger.warning("Could not delete %s: %s", file_path, e)
 
 def cleanup_temp_files(*file_paths: str) -> None:
     """
     Clean up temporary files
-    
+
     Args:
         *file_paths: Paths to files to be deleted
+
+    Deletions are submitted to the pool in one batch and not awaited —
+    callers never need the files again, so there is no reason to hold the
+    request path on N unlink syscalls.
     """
     for file_path in file_paths:
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        except Exception as e:
-            print(f"Warning: Could not delete {file_path}: {e}")
+        _cleanup_pool.submit(_unlink_quietly, file_path)
 
 
 
@@ -503,21 +790,25 @@ def create_error_response(message: str, status_code: int = 400) -> HTTPException
     """
     return HTTPException(status_code=status_code, detail=message)
 
+# Collapses runs of whitespace in city names — compiled once, not per call
+_CITY_CLEAN = re.compile(r"\s+")
+
 def sanitize_city_name(city_name: str) -> str:
     """
     Sanitize city name for API calls
-    
+
     Args:
         city_name: Raw city name
-        
+
     Returns:
         Sanitized city name
     """
     if not city_name or city_name.lower() == "no location found":
         return None
-    
-    # Remove extra spaces and convert to title case
-    return city_name.strip().title()
+
+    # NFC-normalize and collapse whitespace; no .title() — OpenWeather is
+    # case-insensitive and title-casing mangles Indic scripts
+    return _CITY_CLEAN.sub(" ", unicodedata.normalize("NFC", city_name).strip())
 
 def is_valid_language_code(language_code: str) -> bool:
     """
@@ -529,14 +820,9 @@ def is_valid_language_code(language_code: str) -> bool:
     Returns:
         True if supported, False otherwise
     """
-    try:
-        from configs import language_config
-        return language_code in language_config.supported_languages
-    except ImportError:
-        # Fallback if language_config is not available
-        supported_languages = ["en", "hi", "gu", "ta", "te", "bn", "mr", "kn", "ml", "or", "pa", "as"]
-        return language_code in supported_languages
-    
+    return language_code in _SUPPORTED_LANGS
+
+
 
 
 # Utility function to get current month and year
@@ -557,18 +843,15 @@ def get_current_month_and_year() -> Dict[str, str]:
 def get_district_from_coords(lat: float, lon: float) -> Optional[str]:
     """Get city name from coordinates by calling OpenWeatherMap weather API."""
     try:
-        request_url = f"{weather_config.base_url}?lat={lat}&lon={lon}&appid={api_config.openweather_api_key}&units={weather_config.units}"
-        response = requests.get(request_url, timeout=weather_config.timeout_seconds)
-        response.raise_for_status()
+        # Shares the cached response with fetch_weather_data_by_coords — a
+        # request that needs both the name and the weather pays one round-trip
+        weather_data = _owm_by_coords(round(lat, 3), round(lon, 3))
 
-        weather_data = response.json()
-
-        if weather_data.get("cod") != 200:
+        if weather_data is None:
             return None
-        
-        city_name = weather_data.get("name")
-        return city_name
+
+        return weather_data.get("name")
 
     except Exception as e:
-        print(f"Failed to extract city from weather API: {e}")
+        logger.warning("Failed to extract city from weather API: %s", e)
         return None
\ No newline at end of file